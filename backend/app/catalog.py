@@ -0,0 +1,235 @@
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Optional
+
+from .config import settings
+
+# In-process snapshot of the course catalog. Courses are read on almost every page
+# and change rarely, so each worker keeps them in columnar arrays with id/code -> row
+# index maps and serves listing, lookups and existence checks without a database trip.
+#
+# Course ids are serial, so the highest id seen from the database is the sync
+# version: an incremental refresh only fetches rows with a larger id. Serial ids can
+# commit out of order, so ids skipped below the watermark are kept as pending gaps and
+# re-fetched by later syncs until they appear or GAP_SECONDS pass (a rolled-back insert
+# leaves a permanent gap). Writes made through this worker are applied immediately; a
+# periodic full reload picks up rows edited or deleted outside the API.
+#
+# The snapshot only answers hits and ids it can prove absent; any other existence
+# check falls back to a point query, so a course is never reported missing just
+# because this worker has not synced it yet. If a refresh fails after the first load,
+# the stale snapshot keeps being served and the refresh is retried with a backoff.
+
+PAGE_SIZE = 1000        # Supabase caps a single select at 1000 rows
+GAP_SECONDS = 60        # how long a skipped id may still turn up from an open transaction
+GAP_WINDOW = 1000       # only ids this close to the newest one can still be uncommitted
+RETRY_SECONDS = 1       # first retry delay after a failed refresh, doubled up to refresh_seconds
+
+logger = logging.getLogger(__name__)
+
+class _Columns:
+    __slots__ = ("ids", "credits", "teacher_ids", "codes", "names", "descriptions", "by_id", "by_code", "order")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.credits = array("l")
+        self.teacher_ids = array("q")
+        self.codes = []
+        self.names = []
+        self.descriptions = []
+        self.by_id = {}
+        self.by_code = {}
+        self.order = array("q")  # row indexes sorted by course id, for stable paging
+
+    def __len__(self):
+        return len(self.ids)
+
+    def put(self, row: dict):
+        index = self.by_id.get(row["id"])
+        if index is None:
+            # Fill the columns before publishing the index so readers never see a partial row
+            index = len(self.ids)
+            self.credits.append(row["credits"])
+            self.teacher_ids.append(row["teacher_id"])
+            self.codes.append(row["course_code"])
+            self.names.append(row["course_name"])
+            self.descriptions.append(row.get("description"))
+            self.ids.append(row["id"])
+            if not self.order or self.ids[self.order[-1]] < row["id"]:
+                self.order.append(index)
+            else:
+                # A late gap fill or a local write: keep the order by id
+                self.order.insert(bisect_left(self.order, row["id"], key=self.ids.__getitem__), index)
+            self.by_id[row["id"]] = index
+        else:
+            old_code = self.codes[index]
+            if old_code != row["course_code"] and self.by_code.get(old_code) == index:
+                del self.by_code[old_code]
+            self.credits[index] = row["credits"]
+            self.teacher_ids[index] = row["teacher_id"]
+            self.codes[index] = row["course_code"]
+            self.names[index] = row["course_name"]
+            self.descriptions[index] = row.get("description")
+        self.by_code[row["course_code"]] = index
+
+    def row(self, index: int) -> dict:
+        return {
+            "id": self.ids[index],
+            "course_code": self.codes[index],
+            "course_name": self.names[index],
+            "description": self.descriptions[index],
+            "credits": self.credits[index],
+            "teacher_id": self.teacher_ids[index],
+        }
+
+class CourseCatalog:
+    def __init__(self, client=None, refresh_seconds: float = None, full_reload_seconds: float = None):
+        self.client = client
+        self.refresh_seconds = settings.CATALOG_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self.full_reload_seconds = settings.CATALOG_FULL_RELOAD_SECONDS if full_reload_seconds is None else full_reload_seconds
+        self.max_id = 0       # highest course id fetched from the database
+        self._gaps = {}       # skipped id -> monotonic time it was first seen missing
+        self._columns = _Columns()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.RLock()
+        self._synced_at = None
+        self._loaded_at = None
+        self._retry_at = 0.0
+        self._failures = 0
+
+    def __len__(self):
+        return len(self._columns)
+
+    def apply(self, rows: Iterable[dict]):
+        """Add or replace course rows, e.g. the result of a write made by this worker."""
+        with self._lock:
+            for row in rows:
+                self._columns.put(row)
+
+    def load(self, rows: Iterable[dict]):
+        """Replace the whole snapshot with `rows`."""
+        columns = _Columns()
+        for row in rows:
+            columns.put(row)
+        with self._lock:
+            self._columns = columns
+            self.max_id = max(columns.ids, default=0)
+
+    # Database sync
+    def _fetch(self, after_id: int) -> List[dict]:
+        rows = []
+        while True:
+            result = (
+                self.client.table("courses").select("*").gt("id", after_id)
+                .order("id").limit(PAGE_SIZE).execute()
+            )
+            rows.extend(result.data)
+            if len(result.data) < PAGE_SIZE:
+                return rows
+            after_id = result.data[-1]["id"]
+
+    def _fetch_ids(self, ids: List[int]) -> List[dict]:
+        rows = []
+        for start in range(0, len(ids), PAGE_SIZE):
+            result = self.client.table("courses").select("*").in_("id", ids[start:start + PAGE_SIZE]).execute()
+            rows.extend(result.data)
+        return rows
+
+    def sync(self):
+        """Fetch courses added since the last sync, including ids that were skipped before."""
+        with self._refresh_lock:
+            now = time.monotonic()
+            gaps = [course_id for course_id, seen in self._gaps.items() if now - seen < GAP_SECONDS]
+            rows = self._fetch(self.max_id)
+            new_max_id = rows[-1]["id"] if rows else self.max_id
+            missing = self._missing(rows, max(self.max_id, new_max_id - GAP_WINDOW), new_max_id)
+            if gaps:
+                rows.extend(self._fetch_ids(gaps))
+            if rows:
+                self.apply(rows)
+            with self._lock:
+                self.max_id = new_max_id
+                by_id = self._columns.by_id
+                self._gaps = {course_id: self._gaps[course_id] for course_id in gaps if course_id not in by_id}
+                self._gaps.update((course_id, now) for course_id in missing if course_id not in by_id)
+            self._synced_at = now
+
+    def reload(self):
+        """Rebuild the snapshot from the full courses table."""
+        with self._refresh_lock:
+            rows = self._fetch(0)
+            now = time.monotonic()
+            max_id = rows[-1]["id"] if rows else 0
+            # Publish the gaps first so a skipped id is never briefly treated as absent
+            self._gaps = dict.fromkeys(self._missing(rows, max(0, max_id - GAP_WINDOW), max_id), now)
+            self.load(rows)
+            self._loaded_at = self._synced_at = now
+
+    @staticmethod
+    def _missing(rows: List[dict], after_id: int, before_id: int) -> List[int]:
+        """Ids strictly between after_id and before_id that are not in `rows`."""
+        found = {row["id"] for row in rows}
+        return [course_id for course_id in range(after_id + 1, before_id) if course_id not in found]
+
+    def ensure_fresh(self):
+        if self._loaded_at is None:
+            # Nothing to serve yet, so a failed first load is the caller's error
+            with self._refresh_lock:
+                if self._loaded_at is None:
+                    self.reload()
+            return
+        now = time.monotonic()
+        stale = now - self._synced_at >= self.refresh_seconds
+        expired = now - self._loaded_at >= self.full_reload_seconds
+        if not (stale or expired) or now < self._retry_at:
+            return
+        # Once loaded, readers never wait: if another thread is already refreshing, serve the current snapshot
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                if expired:
+                    self.reload()
+                else:
+                    self.sync()
+                self._failures = 0
+            except Exception:
+                self._failures += 1
+                delay = min(self.refresh_seconds, RETRY_SECONDS * 2 ** (self._failures - 1))
+                self._retry_at = now + delay
+                logger.exception("Course catalog refresh failed; serving the stale snapshot, retrying in %.0fs", delay)
+            finally:
+                self._refresh_lock.release()
+
+    # Reads
+    def page(self, skip: int = 0, limit: int = 100) -> List[dict]:
+        self.ensure_fresh()
+        columns = self._columns
+        # Inclusive end, matching the .range(skip, skip + limit) query this replaces
+        return [columns.row(index) for index in columns.order[max(skip, 0):skip + limit + 1]]
+
+    def get(self, course_id: int) -> Optional[dict]:
+        self.ensure_fresh()
+        columns = self._columns
+        index = columns.by_id.get(course_id)
+        return None if index is None else columns.row(index)
+
+    def get_by_code(self, course_code: str) -> Optional[dict]:
+        self.ensure_fresh()
+        columns = self._columns
+        index = columns.by_code.get(course_code)
+        return None if index is None else columns.row(index)
+
+    def exists(self, course_id: int) -> bool:
+        self.ensure_fresh()
+        if course_id in self._columns.by_id:
+            return True
+        # Ids at or below the watermark that are not pending gaps are provably absent
+        if course_id <= self.max_id and course_id not in self._gaps:
+            return False
+        # Otherwise the course may exist but not be synced yet: ask the database directly
+        result = self.client.table("courses").select("*").eq("id", course_id).execute()
+        if result.data:
+            self.apply(result.data)
+        return bool(result.data)
@@ -3,10 +3,55 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def _parse_route_map(name: str, default: dict, maximum: int = None) -> dict:
+    # "/login=8,/dashboard/stats=4" -> {"/login": 8, "/dashboard/stats": 4}
+    value = os.getenv(name)
+    routes = dict(default)
+    if value:
+        routes = {}
+        for item in value.split(","):
+            path, _, number = item.strip().partition("=")
+            if not path or not number.strip().isdigit() or int(number) < 1:
+                raise ValueError(f"{name}: expected '/path=<positive integer>', got {item.strip()!r}")
+            routes[path] = int(number)
+    for path, number in routes.items():
+        if maximum is not None and number > maximum:
+            raise ValueError(f"{name}: {path} costs {number} tokens but RATE_LIMIT_BURST is {maximum}, so it could never be admitted")
+    return routes
+
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = os.getenv("ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
-settings = Settings()
\ No newline at end of file
+    # Production server
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = int(os.getenv("PORT", 8000))
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", 0))  # 0 = size to available cores
+    GRACEFUL_TIMEOUT: int = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+    MAX_REQUESTS: int = int(os.getenv("MAX_REQUESTS", 10000))
+    # Proxies trusted to set X-Forwarded-For, comma-separated or "*"; rate limits key on the resulting client IP
+    FORWARDED_ALLOW_IPS: str = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+    # Admission control
+    # Max in-flight requests per worker for expensive routes; extra requests get 503
+    ROUTE_CONCURRENCY: dict = _parse_route_map(
+        "ROUTE_CONCURRENCY", {"/login": 8, "/register/student": 8, "/register/teacher": 8, "/dashboard/stats": 4}
+    )
+    # Token bucket per client: refill rate, bucket size, and per-route token cost
+    RATE_LIMIT_PER_SECOND: float = float(os.getenv("RATE_LIMIT_PER_SECOND", 10))
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", 40))
+    ROUTE_COST: dict = _parse_route_map(
+        "ROUTE_COST", {"/login": 5, "/register/student": 5, "/register/teacher": 5, "/dashboard/stats": 5},
+        maximum=RATE_LIMIT_BURST,
+    )
+    # Optional shared store so all workers see the same buckets, e.g. redis://localhost:6379/0
+    RATE_LIMIT_REDIS_URL: str = os.getenv("RATE_LIMIT_REDIS_URL")
+    RATE_LIMIT_EXEMPT: tuple = ("/", "/health")
+
+    # Course catalog snapshot: incremental sync and full reload intervals
+    CATALOG_REFRESH_SECONDS: float = float(os.getenv("CATALOG_REFRESH_SECONDS", 30))
+    CATALOG_FULL_RELOAD_SECONDS: float = float(os.getenv("CATALOG_FULL_RELOAD_SECONDS", 600))
+
+settings = Settings()
@@ -0,0 +1,141 @@
+import json
+import time
+from collections import OrderedDict
+
+from .config import settings
+
+# Admission control: per-client token buckets (429) and per-route concurrency caps (503).
+# Both checks run before the request reaches a route, so an over-budget request never
+# touches the database and expensive routes cannot starve cheap ones.
+
+class MemoryBucketStore:
+    """Token buckets kept in this worker's memory, least recently used evicted first."""
+
+    def __init__(self, rate: float, burst: int, max_clients: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()
+
+    async def take(self, key: str, cost: int):
+        """Take `cost` tokens; returns (allowed, seconds until enough tokens)."""
+        now = time.monotonic()
+        tokens, last = self.buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self.buckets[key] = (tokens, now)
+        if len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / self.rate
+
+# Same refill logic as MemoryBucketStore, run atomically inside Redis
+_TAKE_SCRIPT = """
+local rate, burst, cost, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'last')
+local tokens = tonumber(state[1]) or burst
+local last = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - last) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'last', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+REDIS_TIMEOUT = 0.1        # seconds to wait on Redis before falling back to memory
+REDIS_RETRY_SECONDS = 5    # how long to stay on the fallback after a Redis failure
+
+class RedisBucketStore:
+    """Token buckets shared by every worker through Redis.
+
+    Falls back to the worker's memory store if Redis is unreachable, so an outage
+    degrades to per-worker limits instead of rejecting traffic. After a failure,
+    Redis is left alone for REDIS_RETRY_SECONDS so requests do not keep paying the
+    timeout.
+    """
+
+    def __init__(self, url: str, rate: float, burst: int):
+        import redis.asyncio as redis  # optional dependency, only needed for a shared store
+
+        self.rate = rate
+        self.burst = burst
+        self.client = redis.from_url(url, socket_connect_timeout=REDIS_TIMEOUT, socket_timeout=REDIS_TIMEOUT)
+        self.script = self.client.register_script(_TAKE_SCRIPT)
+        self.fallback = MemoryBucketStore(rate, burst)
+        self.retry_at = 0.0
+
+    async def take(self, key: str, cost: int):
+        if time.monotonic() < self.retry_at:
+            return await self.fallback.take(key, cost)
+        try:
+            allowed, tokens = await self.script(
+                keys=[f"ratelimit:{key}"], args=[self.rate, self.burst, cost, time.time()]
+            )
+        except Exception:
+            self.retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            return await self.fallback.take(key, cost)
+        if allowed:
+            return True, 0.0
+        return False, (cost - float(tokens)) / self.rate
+
+def create_bucket_store():
+    if settings.RATE_LIMIT_REDIS_URL:
+        return RedisBucketStore(settings.RATE_LIMIT_REDIS_URL, settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+    return MemoryBucketStore(settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+
+class AdmissionControlMiddleware:
+    """ASGI middleware that sheds load before routing.
+
+    Concurrency counters are plain ints: the middleware only runs on the worker's
+    event loop thread, so no lock is needed.
+    """
+
+    def __init__(self, app, store=None, route_concurrency=None, route_cost=None, exempt=None):
+        self.app = app
+        self.store = store or create_bucket_store()
+        self.route_concurrency = settings.ROUTE_CONCURRENCY if route_concurrency is None else route_concurrency
+        self.route_cost = settings.ROUTE_COST if route_cost is None else route_cost
+        self.exempt = settings.RATE_LIMIT_EXEMPT if exempt is None else exempt
+        self.in_flight = {path: 0 for path in self.route_concurrency}
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or path in self.exempt:
+            return await self.app(scope, receive, send)
+
+        # Reserve a concurrency slot before taking tokens, so a 503 caused by server-side
+        # saturation never costs the client any of its rate budget
+        limit = self.route_concurrency.get(path)
+        if limit is not None:
+            if self.in_flight[path] >= limit:
+                return await self._reject(send, 503, "Server busy, try again shortly", 1)
+            self.in_flight[path] += 1
+
+        try:
+            client = scope.get("client")
+            key = client[0] if client else "unknown"
+            allowed, retry_after = await self.store.take(key, self.route_cost.get(path, 1))
+            if not allowed:
+                return await self._reject(send, 429, "Too many requests", retry_after)
+            await self.app(scope, receive, send)
+        finally:
+            if limit is not None:
+                self.in_flight[path] -= 1
+
+    async def _reject(self, send, status_code: int, detail: str, retry_after: float):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, int(retry_after + 0.999))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -7,6 +7,8 @@ import os
 
 from . import schemas, auth
 from .database import supabase
+from .catalog import CourseCatalog
+from .limits import AdmissionControlMiddleware
 
 app = FastAPI(
     title="Student Management System API",
@@ -14,6 +16,10 @@ app = FastAPI(
     version="2.0.0"
 )
 
+# Admission control (rate limits and per-route concurrency caps); added before CORS
+# so rejected responses still carry CORS headers
+app.add_middleware(AdmissionControlMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +31,9 @@ app.add_middleware(
 
 security = HTTPBearer()
 
+# Course catalog served from memory; loaded on first use
+catalog = CourseCatalog(supabase)
+
 # Dependency to get current user
 def get_current_user(token: str = Depends(security)):
     user_id = auth.verify_token(token.credentials)
@@ -180,10 +189,29 @@ def get_student(student_id: int):
 @app.get("/courses", response_model=List[schemas.CourseResponse])
 def get_courses(skip: int = 0, limit: int = 100):
     try:
-        result = supabase.table("courses").select("*, teacher:teachers(*)").range(skip, skip + limit).execute()
-        return result.data
+        return catalog.page(skip, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/courses/code/{course_code}", response_model=schemas.CourseResponse)
+def get_course_by_code(course_code: str):
+    try:
+        course = catalog.get_by_code(course_code)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return course
+
+@app.get("/courses/{course_id}", response_model=schemas.CourseResponse)
+def get_course(course_id: int):
+    try:
+        course = catalog.get(course_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return course
 
 @app.post("/courses", response_model=schemas.CourseResponse)
 def create_course(course: schemas.CourseCreate, current_user: dict = Depends(get_current_user)):
@@ -192,6 +220,7 @@ def create_course(course: schemas.CourseCreate, current_user: dict = Depends(get
     
     try:
         result = supabase.table("courses").insert(course.dict()).execute()
+        catalog.apply(result.data)
         return result.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -225,6 +254,13 @@ def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
 # Enrollment routes
 @app.post("/enrollments", response_model=schemas.EnrollmentResponse)
 def create_enrollment(enrollment: schemas.EnrollmentCreate, current_user: dict = Depends(get_current_user)):
+    try:
+        course_exists = catalog.exists(enrollment.course_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not course_exists:
+        raise HTTPException(status_code=404, detail="Course not found")
+
     try:
         enrollment_data = enrollment.dict()
         enrollment_data["enrollment_date"] = datetime.utcnow().isoformat()
@@ -239,6 +275,12 @@ def create_enrollment(enrollment: schemas.EnrollmentCreate, current_user: dict =
 def create_grade(grade: schemas.GradeCreate, current_user: dict = Depends(get_current_user)):
     if current_user["role"] not in ["admin", "teacher"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    try:
+        course_exists = catalog.exists(grade.course_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not course_exists:
+        raise HTTPException(status_code=404, detail="Course not found")
     
     try:
         result = supabase.table("grades").insert(grade.dict()).execute()
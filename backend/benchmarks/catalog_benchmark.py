@@ -0,0 +1,69 @@
+"""Memory and latency of the course catalog snapshot at 100k courses.
+
+Compares the columnar CourseCatalog with keeping the raw Supabase rows as a list of
+dicts. No database is needed. Run from the backend directory:
+
+    python benchmarks/catalog_benchmark.py [course_count]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.catalog import CourseCatalog
+
+def make_rows(count):
+    return [
+        {
+            "id": i,
+            "course_code": f"C{i:06d}",
+            "course_name": f"Course {i}",
+            "description": None if i % 3 else f"Description of course {i}",
+            "credits": 1 + i % 5,
+            "teacher_id": 1 + i % 500,
+        }
+        for i in range(1, count + 1)
+    ]
+
+def measure_memory(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+def per_call(fn, args):
+    start = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    # Never refresh from the (absent) database during the benchmark
+    catalog = CourseCatalog(refresh_seconds=float("inf"), full_reload_seconds=float("inf"))
+    catalog._loaded_at = catalog._synced_at = time.monotonic()
+
+    rows, rows_size = measure_memory(lambda: make_rows(count))
+    _, catalog_size = measure_memory(lambda: catalog.load(make_rows(count)))
+    print(f"courses: {count}")
+    print(f"memory   list of dicts {rows_size / 2**20:8.1f} MiB")
+    print(f"memory   CourseCatalog {catalog_size / 2**20:8.1f} MiB")
+
+    by_id = {row["id"]: row for row in rows}
+    ids = list(range(1, count + 1, max(1, count // 10000)))
+    codes = [f"C{i:06d}" for i in ids]
+    missing = [count + i for i in range(len(ids))]
+    catalog.max_id = 2 * count + len(ids)  # ids above the watermark would trigger a sync
+
+    print(f"latency  get by id     {per_call(catalog.get, ids):8.2f} us   (dict of rows {per_call(by_id.get, ids):.2f} us)")
+    print(f"latency  get by code   {per_call(catalog.get_by_code, codes):8.2f} us")
+    print(f"latency  exists (hit)  {per_call(catalog.exists, ids):8.2f} us")
+    print(f"latency  exists (miss) {per_call(catalog.exists, missing):8.2f} us")
+    skips = list(range(0, count, max(1, count // 1000)))
+    print(f"latency  page of 100   {per_call(lambda skip: catalog.page(skip, 100), skips):8.2f} us")
+
+if __name__ == "__main__":
+    main()
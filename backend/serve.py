@@ -0,0 +1,61 @@
+"""Production entry point: `python serve.py`.
+
+Runs gunicorn with uvicorn workers, one per available core unless WEB_CONCURRENCY
+is set. Send SIGHUP to the master for a graceful reload (new workers start before
+old ones finish their in-flight requests); workers are also recycled after
+MAX_REQUESTS requests. Use run.py for local development with auto-reload.
+"""
+import os
+
+from app.config import settings
+
+def available_cores():
+    # Respect CPU affinity / container cpusets where the platform exposes them
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def worker_count():
+    return settings.WEB_CONCURRENCY or available_cores()
+
+def main():
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        # gunicorn is POSIX-only; uvicorn's own supervisor still gives N workers
+        import uvicorn
+        uvicorn.run(
+            "app.main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            workers=worker_count(),
+            timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT,
+            proxy_headers=True,
+            forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        )
+        return
+
+    class Server(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{settings.HOST}:{settings.PORT}",
+                "workers": worker_count(),
+                "worker_class": "uvicorn.workers.UvicornWorker",
+                "graceful_timeout": settings.GRACEFUL_TIMEOUT,
+                "timeout": settings.GRACEFUL_TIMEOUT * 2,
+                "max_requests": settings.MAX_REQUESTS,
+                "max_requests_jitter": settings.MAX_REQUESTS // 10,
+                "forwarded_allow_ips": settings.FORWARDED_ALLOW_IPS,
+                "accesslog": "-",
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    Server().run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import threading
+import types
+
+import pytest
+
+from app import catalog as catalog_module
+from app.catalog import CourseCatalog
+
+def course(course_id, code=None):
+    return {
+        "id": course_id,
+        "course_code": code or f"C{course_id}",
+        "course_name": f"Course {course_id}",
+        "description": None,
+        "credits": 3,
+        "teacher_id": 1,
+    }
+
+class FakeQuery:
+    def __init__(self, client):
+        self.client = client
+        self.filters = []
+        self.row_limit = None
+
+    def select(self, columns):
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row[column] > value)
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row[column] in values)
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def execute(self):
+        self.client.queries += 1
+        rows = sorted((row for row in self.client.rows.values() if all(f(row) for f in self.filters)), key=lambda row: row["id"])
+        return types.SimpleNamespace(data=rows[:self.row_limit])
+
+class FakeClient:
+    """Stands in for the Supabase client; `rows` holds the committed courses."""
+
+    def __init__(self, rows=()):
+        self.rows = {row["id"]: row for row in rows}
+        self.queries = 0
+        self.attempts = 0
+        self.error = None
+
+    def table(self, name):
+        assert name == "courses"
+        self.attempts += 1
+        if self.error:
+            raise self.error
+        return FakeQuery(self)
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(catalog_module, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+@pytest.fixture
+def client():
+    return FakeClient(course(i) for i in range(1, 4))
+
+@pytest.fixture
+def catalog(client, clock):
+    return CourseCatalog(client, refresh_seconds=30, full_reload_seconds=600)
+
+def test_first_read_loads_snapshot(catalog, client):
+    assert catalog.get(2)["course_code"] == "C2"
+    assert catalog.get_by_code("C3")["id"] == 3
+    assert catalog.get(99) is None
+    assert len(catalog) == 3
+    queries = client.queries
+    catalog.get(1)
+    assert client.queries == queries
+
+def test_page_end_is_inclusive(catalog):
+    assert [row["id"] for row in catalog.page(0, 1)] == [1, 2]
+    assert [row["id"] for row in catalog.page(1, 100)] == [2, 3]
+    assert catalog.page(10, 5) == []
+
+def test_incremental_sync_fetches_new_rows(catalog, client, clock):
+    catalog.page()
+    client.rows[4] = course(4)
+    assert catalog.get(4) is None
+    clock[0] += 30
+    assert catalog.get(4)["id"] == 4
+    assert catalog.max_id == 4
+
+def test_apply_remaps_changed_code(catalog):
+    catalog.page()
+    catalog.apply([course(2, code="NEW2")])
+    assert catalog.get_by_code("C2") is None
+    assert catalog.get_by_code("NEW2")["id"] == 2
+    assert catalog.get(2)["course_code"] == "NEW2"
+    assert len(catalog) == 3
+
+def test_miss_shortly_after_sync_queries_database(catalog, client, clock):
+    catalog.page()
+    # Another worker creates course 4 just after this worker synced
+    client.rows[4] = course(4)
+    clock[0] += 0.5
+    assert catalog.exists(4)
+    assert catalog.get(4)["id"] == 4
+
+def test_miss_while_refresh_lock_held_queries_database(catalog, client, clock):
+    catalog.page()
+    client.rows[4] = course(4)
+    clock[0] += 30
+    holding, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with catalog._refresh_lock:
+            holding.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    holding.wait(5)
+    try:
+        assert catalog.exists(4)
+    finally:
+        release.set()
+        holder.join()
+
+def test_unknown_id_above_watermark_is_absent(catalog, client):
+    catalog.page()
+    queries = client.queries
+    assert not catalog.exists(10**9)
+    assert client.queries == queries + 1
+
+def test_miss_below_watermark_skips_database(catalog, client):
+    catalog.page()
+    catalog.load([course(1), course(3)])
+    queries = client.queries
+    assert not catalog.exists(2)
+    assert client.queries == queries
+
+def test_reload_tracks_gaps_near_the_top(catalog, client, clock):
+    catalog.page()
+    del client.rows[2]
+    catalog.reload()
+    queries = client.queries
+    client.rows[2] = course(2)
+    # Id 2 is a gap close to the top, so it is still looked up
+    assert catalog.exists(2)
+    assert client.queries > queries
+
+def test_out_of_order_commit_is_picked_up(catalog, client, clock):
+    catalog.page()
+    # Id 5 commits before id 4
+    client.rows[5] = course(5)
+    clock[0] += 30
+    assert catalog.exists(5)
+    assert catalog.max_id == 5
+    assert not catalog.exists(4)
+    client.rows[4] = course(4)
+    assert catalog.exists(4)
+    assert [row["id"] for row in catalog.page()] == [1, 2, 3, 4, 5]
+
+def test_gap_is_refetched_by_periodic_sync(catalog, client, clock):
+    catalog.page()
+    client.rows[5] = course(5)
+    clock[0] += 30
+    catalog.page()
+    client.rows[4] = course(4)
+    clock[0] += 30
+    assert catalog.get(4)["id"] == 4
+    assert [row["id"] for row in catalog.page()] == [1, 2, 3, 4, 5]
+
+def test_gap_expires(catalog, client, clock):
+    catalog.page()
+    client.rows[5] = course(5)
+    clock[0] += 30
+    catalog.page()
+    clock[0] += catalog_module.GAP_SECONDS
+    catalog.sync()
+    queries = client.queries
+    assert not catalog.exists(4)
+    assert client.queries == queries
+
+def test_full_reload_drops_deleted_rows(catalog, client, clock):
+    catalog.page()
+    del client.rows[1]
+    clock[0] += 600
+    assert catalog.get(1) is None
+    assert [row["id"] for row in catalog.page()] == [2, 3]
+
+def test_local_write_keeps_page_order(catalog):
+    catalog.page()
+    catalog.apply([course(10), course(7)])
+    assert [row["id"] for row in catalog.page()] == [1, 2, 3, 7, 10]
+    assert [row["id"] for row in catalog.page(3, 0)] == [7]
+
+def test_first_load_failure_raises(catalog, client):
+    client.error = ConnectionError("database down")
+    with pytest.raises(ConnectionError):
+        catalog.page()
+
+def test_failed_refresh_serves_stale_snapshot(catalog, client, clock):
+    catalog.page()
+    client.error = ConnectionError("database down")
+    clock[0] += 30
+    assert [row["id"] for row in catalog.page()] == [1, 2, 3]
+    # Retries back off instead of hitting the database on every read
+    attempts = client.attempts
+    catalog.page()
+    assert client.attempts == attempts
+    clock[0] += catalog_module.RETRY_SECONDS
+    catalog.page()
+    assert client.attempts == attempts + 1
+    clock[0] += catalog_module.RETRY_SECONDS
+    catalog.page()
+    assert client.attempts == attempts + 1
+    # Once the database is back, the next retry refreshes the snapshot
+    client.error = None
+    client.rows[4] = course(4)
+    clock[0] += catalog_module.RETRY_SECONDS
+    assert catalog.get(4)["id"] == 4
+
+def test_failed_reload_serves_stale_snapshot(catalog, client, clock):
+    catalog.page()
+    client.error = ConnectionError("database down")
+    clock[0] += 600
+    assert catalog.get(1)["id"] == 1
@@ -0,0 +1,194 @@
+import asyncio
+import sys
+import types
+
+import pytest
+
+from app import config
+from app import limits as limits_module
+from app.limits import AdmissionControlMiddleware, MemoryBucketStore
+
+def request(path, method="POST", client=("10.0.0.1", 5000)):
+    return {"type": "http", "method": method, "path": path, "client": client}
+
+class Recorder:
+    """Collects what the middleware sends back."""
+
+    def __init__(self):
+        self.status = None
+        self.headers = {}
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = dict(message["headers"])
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+class FakeStore:
+    """Records every take() and answers with a fixed result."""
+
+    def __init__(self, allowed=True, retry_after=0.0):
+        self.allowed = allowed
+        self.retry_after = retry_after
+        self.calls = []
+
+    async def take(self, key, cost):
+        self.calls.append((key, cost))
+        return self.allowed, self.retry_after
+
+def call(middleware, scope):
+    send = Recorder()
+    asyncio.run(middleware(scope, None, send))
+    return send
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(limits_module, "time", types.SimpleNamespace(monotonic=lambda: now[0], time=lambda: now[0]))
+    return now
+
+def test_bucket_refills_over_time(clock):
+    store = MemoryBucketStore(rate=2, burst=4)
+    assert asyncio.run(store.take("a", 4)) == (True, 0.0)
+    allowed, retry_after = asyncio.run(store.take("a", 3))
+    assert not allowed
+    assert retry_after == pytest.approx(1.5)
+    clock[0] += 1.5
+    assert asyncio.run(store.take("a", 3)) == (True, 0.0)
+
+def test_bucket_is_per_client_and_capped_at_burst(clock):
+    store = MemoryBucketStore(rate=1, burst=2)
+    assert asyncio.run(store.take("a", 2))[0]
+    assert asyncio.run(store.take("b", 2))[0]
+    clock[0] += 100
+    assert asyncio.run(store.take("a", 2))[0]
+    assert not asyncio.run(store.take("a", 1))[0]
+
+def test_rate_limited_request_gets_429_with_retry_after():
+    store = FakeStore(allowed=False, retry_after=2.2)
+    middleware = AdmissionControlMiddleware(ok_app, store=store, route_concurrency={}, route_cost={"/login": 5}, exempt=())
+    send = call(middleware, request("/login"))
+    assert send.status == 429
+    assert send.headers[b"retry-after"] == b"3"
+    assert store.calls == [("10.0.0.1", 5)]
+
+def test_full_route_gets_503_without_spending_tokens():
+    store = FakeStore()
+    middleware = AdmissionControlMiddleware(ok_app, store=store, route_concurrency={"/login": 1}, route_cost={}, exempt=())
+    middleware.in_flight["/login"] = 1
+    send = call(middleware, request("/login"))
+    assert send.status == 503
+    assert store.calls == []
+    assert middleware.in_flight["/login"] == 1
+
+def test_concurrent_requests_over_cap_get_503():
+    async def slow_app(scope, receive, send):
+        await asyncio.sleep(0.01)
+        await ok_app(scope, receive, send)
+
+    middleware = AdmissionControlMiddleware(slow_app, store=FakeStore(), route_concurrency={"/login": 2}, route_cost={}, exempt=())
+    senders = [Recorder() for _ in range(4)]
+
+    async def run():
+        await asyncio.gather(*(middleware(request("/login"), None, send) for send in senders))
+
+    asyncio.run(run())
+    assert sorted(send.status for send in senders) == [200, 200, 503, 503]
+    assert middleware.in_flight["/login"] == 0
+
+def test_slot_released_on_429():
+    middleware = AdmissionControlMiddleware(ok_app, store=FakeStore(allowed=False), route_concurrency={"/login": 1}, route_cost={}, exempt=())
+    assert call(middleware, request("/login")).status == 429
+    assert middleware.in_flight["/login"] == 0
+
+def test_slot_released_when_app_raises():
+    async def failing_app(scope, receive, send):
+        raise RuntimeError("boom")
+
+    middleware = AdmissionControlMiddleware(failing_app, store=FakeStore(), route_concurrency={"/login": 1}, route_cost={}, exempt=())
+    with pytest.raises(RuntimeError):
+        call(middleware, request("/login"))
+    assert middleware.in_flight["/login"] == 0
+
+@pytest.mark.parametrize("scope", [request("/health"), request("/", method="GET"), request("/login", method="OPTIONS")])
+def test_exempt_paths_and_preflight_skip_limits(scope):
+    store = FakeStore(allowed=False)
+    middleware = AdmissionControlMiddleware(ok_app, store=store, route_concurrency={"/login": 0}, route_cost={}, exempt=("/", "/health"))
+    assert call(middleware, scope).status == 200
+    assert store.calls == []
+
+def test_unlisted_route_costs_one_token():
+    store = FakeStore()
+    middleware = AdmissionControlMiddleware(ok_app, store=store, route_concurrency={}, route_cost={"/login": 5}, exempt=())
+    assert call(middleware, request("/courses", method="GET")).status == 200
+    assert store.calls == [("10.0.0.1", 1)]
+
+def test_parse_route_map_uses_default_when_unset(monkeypatch):
+    monkeypatch.delenv("ROUTE_COST", raising=False)
+    assert config._parse_route_map("ROUTE_COST", {"/login": 5}, maximum=40) == {"/login": 5}
+
+def test_parse_route_map_reads_env(monkeypatch):
+    monkeypatch.setenv("ROUTE_COST", "/login=7, /dashboard/stats=3")
+    assert config._parse_route_map("ROUTE_COST", {}, maximum=40) == {"/login": 7, "/dashboard/stats": 3}
+
+@pytest.mark.parametrize("value", ["/login=abc", "/login", "=5", "/login=0", "/login=-1", "/login=2.5"])
+def test_parse_route_map_rejects_malformed_entries(monkeypatch, value):
+    monkeypatch.setenv("ROUTE_COST", value)
+    with pytest.raises(ValueError, match="ROUTE_COST"):
+        config._parse_route_map("ROUTE_COST", {}, maximum=40)
+
+def test_parse_route_map_rejects_cost_above_burst(monkeypatch):
+    monkeypatch.setenv("ROUTE_COST", "/login=41")
+    with pytest.raises(ValueError, match="RATE_LIMIT_BURST"):
+        config._parse_route_map("ROUTE_COST", {}, maximum=40)
+    monkeypatch.delenv("ROUTE_COST")
+    with pytest.raises(ValueError, match="RATE_LIMIT_BURST"):
+        config._parse_route_map("ROUTE_COST", {"/login": 5}, maximum=3)
+
+class FakeScript:
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+        self.result = [1, "0"]
+
+    async def __call__(self, keys, args):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.result
+
+@pytest.fixture
+def redis_script(monkeypatch):
+    script = FakeScript()
+    redis_client = types.SimpleNamespace(register_script=lambda source: script)
+    redis_asyncio = types.SimpleNamespace(from_url=lambda url, **options: redis_client)
+    monkeypatch.setitem(sys.modules, "redis", types.SimpleNamespace(asyncio=redis_asyncio))
+    monkeypatch.setitem(sys.modules, "redis.asyncio", redis_asyncio)
+    return script
+
+def test_redis_store_uses_script_result(clock, redis_script):
+    store = limits_module.RedisBucketStore("redis://example", rate=2, burst=10)
+    assert asyncio.run(store.take("a", 1)) == (True, 0.0)
+    redis_script.result = [0, "1"]
+    allowed, retry_after = asyncio.run(store.take("a", 5))
+    assert not allowed
+    assert retry_after == pytest.approx(2.0)
+
+def test_redis_store_falls_back_and_backs_off(clock, redis_script):
+    store = limits_module.RedisBucketStore("redis://example", rate=1, burst=2)
+    redis_script.error = ConnectionError("unreachable")
+    assert asyncio.run(store.take("a", 2)) == (True, 0.0)
+    assert redis_script.calls == 1
+    assert store.retry_at == clock[0] + limits_module.REDIS_RETRY_SECONDS
+
+    # Within the retry window Redis is not touched and the memory bucket applies
+    assert not asyncio.run(store.take("a", 2))[0]
+    assert redis_script.calls == 1
+
+    clock[0] += limits_module.REDIS_RETRY_SECONDS
+    redis_script.error = None
+    assert asyncio.run(store.take("a", 2)) == (True, 0.0)
+    assert redis_script.calls == 2